@@ -2,10 +2,14 @@ import argparse
 import os
 import importlib
 import yaml
-import json
 import logging
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import orjson
+import ijson
 
-from src.utils.config_loader import load_spec
+from src.utils.config_loader import load_spec, load_config
+from src.utils.logging_config import configure_logging
 from src.generators.lua_module_generator import generate_lua_modules
 from src.generators.json_map_generator import generate_json_maps
 from src.generators.changelog_generator import ChangelogGenerator
@@ -14,6 +18,36 @@ from src.utils.archiver import archive_version_sources, get_latest_archive
 from src.utils.pipeline_runner import PipelineRunner
 
 
+def _write_json_array(path, items):
+    """
+    Writes items as a two-space indented JSON array, encoding one element at a time
+    so the full document is never materialized as a single buffer.
+    """
+    option = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+    with open(path, 'wb') as f:
+        f.write(b'[')
+        is_empty = True
+        
+        for item in items:
+            f.write(b'\n  ' if is_empty else b',\n  ')
+            f.write(orjson.dumps(item, option=option).replace(b'\n', b'\n  '))
+            is_empty = False
+        f.write(b']' if is_empty else b'\n]')
+
+
+class _StreamedJsonArray:
+    """
+    Re-iterable view over a JSON array file. Each iteration streams the elements
+    from disk, so the whole array is never loaded at once.
+    """
+    def __init__(self, path):
+        self.path = path
+
+    def __iter__(self):
+        with open(self.path, 'rb') as f:
+            yield from ijson.items(f, 'item', use_float=True)
+
+
 def run_processing_pipeline(spec_name, action, global_config):
     logging.info(f"--- Running processing for '{spec_name}' ---")
     
@@ -36,8 +70,7 @@ def run_processing_pipeline(spec_name, action, global_config):
             output_dir = "staging/outputs"
             os.makedirs(output_dir, exist_ok=True)
             output_path = os.path.join(output_dir, f"{spec_name}_resolved.json")
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(resolved_objects, f, indent=2, ensure_ascii=False)
+            _write_json_array(output_path, resolved_objects)
             logging.info(f"Saved final resolved data to {output_path}")
         
         if action == 'resolve': return
@@ -46,13 +79,12 @@ def run_processing_pipeline(spec_name, action, global_config):
     if action in ['generate-modules', 'full']:
         logging.info("--- Stage 3: Starting Module Generation ---")
         if not resolved_objects:
-            resolved_path = f"staging/output/{spec_name}_resolved.json"
-            try:
-                with open(resolved_path, 'r', encoding='utf-8') as f: resolved_objects = json.load(f)
-                logging.info(f"Loaded resolved data from {resolved_path}")
-            except FileNotFoundError:
+            resolved_path = f"staging/outputs/{spec_name}_resolved.json"
+            if not os.path.exists(resolved_path):
                 logging.error(f"Could not find {resolved_path}. Please run with '--action resolve' first.")
                 return
+            resolved_objects = _StreamedJsonArray(resolved_path)
+            logging.info(f"Streaming resolved data from {resolved_path}")
         generate_lua_modules(spec_name, resolved_objects, global_config)
         generate_json_maps(spec_name, resolved_objects, global_config)
         logging.info("--- Stage 3: Finished ---")
@@ -199,13 +231,12 @@ def main():
 
     # --- Logging Setup ---
     log_level = logging.DEBUG if args.verbose else logging.INFO
-    logging.basicConfig(level=log_level, format='%(asctime)s - %(levelname)s - %(message)s')
+    configure_logging(log_level)
 
     # --- Config Loading ---
     try:
         config_path = os.path.abspath('configs/codex_config.yaml')
-        with open(config_path, 'r') as f:
-            global_config = yaml.safe_load(f)
+        global_config = load_config(config_path)
     except FileNotFoundError:
         logging.error("codex_config.yaml not found. Please create it.")
         return
@@ -235,8 +266,14 @@ def main():
         if args.all_specs:
             config_dir = 'configs/specs'
             all_specs = [f.replace('.yaml', '') for f in os.listdir(config_dir) if f.endswith('.yaml')]
-            for spec_name in all_specs:
-                run_processing_pipeline(spec_name, args.action, global_config)
+            workers = min(os.cpu_count() or 1, len(all_specs))
+            if workers > 1:
+                # Specs are independent, so each one runs in its own worker process.
+                with ProcessPoolExecutor(max_workers=workers, initializer=configure_logging, initargs=(log_level,)) as executor:
+                    list(executor.map(partial(run_processing_pipeline, action=args.action, global_config=global_config), all_specs))
+            else:
+                for spec_name in all_specs:
+                    run_processing_pipeline(spec_name, args.action, global_config)
         elif args.spec:
             run_processing_pipeline(args.spec, args.action, global_config)
         elif not (args.changelog or args.changelog_historical or args.changelog_v1 or args.changelog_v2):
@@ -1,5 +1,7 @@
 import requests
 import logging
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from .base_extractor import BaseExtractor
 
 
@@ -7,11 +9,20 @@ class ApiExtractor(BaseExtractor):
     """
     Extracts data from a remote API endpoint.
     """
+    # Shared across instances so connections (and TLS handshakes) to the same host are reused.
+    _session = requests.Session()
+    _session.mount('https://', HTTPAdapter(pool_connections=8, pool_maxsize=32, max_retries=Retry(total=3, backoff_factor=0.3)))
+
     def extract(self, source_info, config):
         url = source_info['url']
         logging.info(f"Extracting data from API: {url}")
         try:
-            response = requests.get(url)
+            response = self._session.get(
+                url,
+                headers=source_info.get('headers'),
+                params=source_info.get('params'),
+                timeout=(5, 30)
+            )
             response.raise_for_status()
             return response.json()
         except requests.RequestException as e:
@@ -3,6 +3,7 @@ import json
 import logging
 import requests
 import zipfile
+from src.utils.file_utils import write_text_atomic
 
 class CdnExtractor:
     """
@@ -85,9 +86,7 @@ class CdnExtractor:
             if ".zip/" in path:
                 return
                 
-            os.makedirs(os.path.dirname(path), exist_ok=True)
-            with open(path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            write_text_atomic(path, json.dumps(data, indent=2, ensure_ascii=False))
             logging.debug(f"Saved CDN data to {path}")
         except Exception as e:
             logging.warning(f"Failed to save local copy of CDN data: {e}")
@@ -5,7 +5,7 @@ import zipfile
 import tempfile
 import shutil
 import re
-from src.utils.config_loader import load_spec
+from src.utils.config_loader import load_spec, load_yaml
 from src.utils.pipeline_runner import PipelineRunner
 
 class ChangelogGenerator:
@@ -23,9 +23,7 @@ class ChangelogGenerator:
         path = 'configs/link_rules.yaml'
         if os.path.exists(path):
             try:
-                import yaml
-                with open(path, 'r', encoding='utf-8') as f:
-                    return yaml.safe_load(f) or {}
+                return load_yaml(path) or {}
             except: pass
         return {}
 
@@ -33,9 +31,7 @@ class ChangelogGenerator:
         path = 'configs/changelog_curation.yaml'
         if os.path.exists(path):
             try:
-                import yaml
-                with open(path, 'r', encoding='utf-8') as f:
-                    return yaml.safe_load(f) or {}
+                return load_yaml(path) or {}
             except Exception as e:
                 logging.error(f"Error loading curation rules: {e}")
         return {}
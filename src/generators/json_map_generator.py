@@ -2,16 +2,34 @@ import os
 import json
 import logging
 import re
+import functools
+import orjson
 
+# world_type may be decoded as either an int or a string.
+_WORLD_1 = (1, '1')
+_SANITIZE_RE = re.compile(r'[^a-zA-Z0-9_]')
+_LEADING_INDENT_RE = re.compile(rb'^(?:  )+', re.MULTILINE)
 
+
+@functools.lru_cache(maxsize=4096)
 def _sanitize_group_id(name):
     """
     Sanitizes a string to be used as a group ID.
+    Cached since the same creature name recurs across many spawners.
     """
     
     if not name:
         return None
-    return re.sub(r'[^a-zA-Z0-9_]', '', name.replace(' ', '_'))
+    return _SANITIZE_RE.sub('', name.replace(' ', '_')) or None
+
+
+def _dump_tab_indented(obj):
+    """
+    Serializes an object to tab-indented JSON bytes.
+    orjson only indents with two spaces, so each leading pair is swapped for a tab.
+    """
+    data = orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return _LEADING_INDENT_RE.sub(lambda m: b'\t' * (len(m.group(0)) // 2), data)
 
 
 def _process_survival_icons(resolved_data, staging_dir, template_path):
@@ -21,31 +39,30 @@ def _process_survival_icons(resolved_data, staging_dir, template_path):
     logging.info("Processing map data for 'survival_icons'...")
     with open(template_path, 'r', encoding='utf-8') as f:
         output_data = json.load(f)
-    unique_creatures = {}
+    seen_creatures = set()
+    groups = {}
     
     for spawner in resolved_data:
         for creature in spawner.get('creatures', []):
             creature_id = creature.get('creature_id')
             
-            if creature_id and creature_id not in unique_creatures:
-                unique_creatures[creature_id] = creature
-    groups = {}
-    
-    for creature_id, creature in unique_creatures.items():
-        name_en = creature.get('name_en', f'Creature {creature_id}')
-        group_id = _sanitize_group_id(name_en)
-        
-        if group_id:
-            groups[group_id] = {
-                "name": name_en,
-                "icon": "IconMapMarkEnemy.png",
-                "size": [50, 50]
-            }
+            if not creature_id or creature_id in seen_creatures:
+                continue
+            seen_creatures.add(creature_id)
+            name_en = creature.get('name_en', f'Creature {creature_id}')
+            group_id = _sanitize_group_id(name_en)
+            
+            if group_id:
+                groups[group_id] = {
+                    "name": name_en,
+                    "icon": "IconMapMarkEnemy.png",
+                    "size": [50, 50]
+                }
     output_data['groups'] = groups
     output_filename = os.path.basename(template_path)
     output_path = os.path.join(staging_dir, output_filename)
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(output_data, f, indent='\t')
+    with open(output_path, 'wb') as f:
+        f.write(_dump_tab_indented(output_data))
     logging.info(f"Generated and staged map JSON: {output_filename}")
 
 
@@ -54,60 +71,59 @@ def _process_simulation_room(resolved_data, staging_dir, template_path):
     Processes data for the Simulation Room map.
     """
     logging.info("Processing map data for 'simulation_room'...")
-    logging.debug(f"Total spawners received: {len(resolved_data)}")
     with open(template_path, 'r', encoding='utf-8') as f:
         output_data = json.load(f)
     markers = {}
     
     for i, spawner in enumerate(resolved_data):
         spawner_id = spawner.get('spawner_id')
-        logging.debug(f"--- Processing spawner {i+1}/{len(resolved_data)}: ID {spawner_id} ---")
-        static_territories_world1 = [t for t in spawner.get('static_territory', []) if str(t.get('world_type')) == '1']
-        biome_territories_world1 = [t for t in spawner.get('biome_territory', []) if str(t.get('world_type')) == '1']
-        logging.debug(f"Spawner {spawner_id}: Found {len(static_territories_world1)} static territories and {len(biome_territories_world1)} biome territories in world 1.")
+        logging.debug("--- Processing spawner %d: ID %s ---", i + 1, spawner_id)
+        static_territories_world1 = [t for t in spawner.get('static_territory', []) if t.get('world_type') in _WORLD_1]
+        logging.debug("Spawner %s: Found %d static territories in world 1.", spawner_id, len(static_territories_world1))
         
-        if not static_territories_world1 and not biome_territories_world1:
-            logging.debug(f"Spawner {spawner_id}: Skipping, not in world 1.")
+        # Biome territories only decide membership, so stop at the first world 1 match.
+        if not static_territories_world1 and not any(t.get('world_type') in _WORLD_1 for t in spawner.get('biome_territory', [])):
+            logging.debug("Spawner %s: Skipping, not in world 1.", spawner_id)
             continue
-        logging.debug(f"Spawner {spawner_id}: Processing as it belongs to world 1.")
+        logging.debug("Spawner %s: Processing as it belongs to world 1.", spawner_id)
         all_positions = []
         all_positions.extend(spawner.get('spawn_positions', []))
         all_positions.extend(static_territories_world1)
-        logging.debug(f"Spawner {spawner_id}: Total positions to process: {len(all_positions)}")
+        logging.debug("Spawner %s: Total positions to process: %d", spawner_id, len(all_positions))
+        
+        # Coordinates and description are the same for every creature of this spawner.
+        valid_positions = []
+        
+        for pos in all_positions:
+            lon = pos.get('x')
+            lat = pos.get('z')
+            
+            if lon is not None and lat is not None:
+                valid_positions.append((lon, lat))
+            else:
+                logging.debug("Spawner %s: Skipping position due to missing coordinates: %s", spawner_id, pos)
+        description = f"Spawner ID: {spawner_id}"
         
         for creature in spawner.get('creatures', []):
             name_en = creature.get('name_en', f'Creature {creature.get("creature_id")}')
             group_id = _sanitize_group_id(name_en)
-            logging.debug(f"Spawner {spawner_id}: Processing creature '{name_en}' with group ID '{group_id}'")
+            logging.debug("Spawner %s: Processing creature '%s' with group ID '%s'", spawner_id, name_en, group_id)
             
             if not group_id:
-                logging.debug(f"Spawner {spawner_id}: Skipping creature with no group ID.")
+                logging.debug("Spawner %s: Skipping creature with no group ID.", spawner_id)
                 continue
-            
-            if group_id not in markers:
-                markers[group_id] = []
-            
-            for pos in all_positions:
-                lon = pos.get('x')
-                lat = pos.get('z')
-                
-                if lon is not None and lat is not None:
-                    marker_data = {
-                        "name": name_en,
-                        "description": f"Spawner ID: {spawner_id}",
-                        "lon": lon,
-                        "lat": lat,
-                    }
-                    markers[group_id].append(marker_data)
-                    logging.debug(f"Spawner {spawner_id}: Added marker for group '{group_id}' at lon={lon}, lat={lat}")
-                else:
-                    logging.debug(f"Spawner {spawner_id}: Skipping position due to missing coordinates: {pos}")
-    logging.debug(f"Final markers dictionary: {json.dumps(markers, indent=2)}")
+            markers.setdefault(group_id, []).extend(
+                {"name": name_en, "description": description, "lon": lon, "lat": lat}
+                for lon, lat in valid_positions
+            )
+            logging.debug("Spawner %s: Added %d markers for group '%s'", spawner_id, len(valid_positions), group_id)
+    if logging.getLogger().isEnabledFor(logging.DEBUG):
+        logging.debug(f"Final markers dictionary: {json.dumps(markers, indent=2)}")
     output_data['markers'] = markers
     output_filename = os.path.basename(template_path)
     output_path = os.path.join(staging_dir, output_filename)
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(output_data, f, indent='\t')
+    with open(output_path, 'wb') as f:
+        f.write(_dump_tab_indented(output_data))
     logging.info(f"Generated and staged map JSON: {output_filename}")
 
 
@@ -1,30 +1,66 @@
+import io
 import os
 import json
 import logging
-import shutil
-import yaml
+from src.utils.config_loader import load_yaml
+from src.utils.file_utils import copy_file_atomic, write_text_atomic
 
 
-def to_lua_table(obj, indent=2):
+# Indentation only ever grows in steps of two, so the common widths are built once.
+_INDENTS = tuple(' ' * i for i in range(0, 64, 2))
+
+
+def _indent_str(indent):
+    if indent < 64 and indent % 2 == 0:
+        return _INDENTS[indent // 2]
+    return ' ' * indent
+
+
+def _write_lua_table(buf, obj, indent):
     """
-    Naively converts a Python object to a Lua table string.
+    Writes the Lua table representation of obj into buf.
     """
+    write = buf.write
     
     if isinstance(obj, dict):
-        parts = []
+        item_indent = _indent_str(indent + 2)
+        write('{\n')
         
-        for key, value in obj.items():
+        for i, (key, value) in enumerate(obj.items()):
+            if i:
+                write(',\n')
+            write(item_indent)
+            
             if isinstance(key, str) and key.isidentifier():
-                key_str = key
+                write(key)
             else:
-                key_str = f'["{key}"]'
-            parts.append(f'{" " * (indent + 2)}{key_str} = {to_lua_table(value, indent + 2)}')
-        return '{\n' + ',\n'.join(parts) + '\n' + ' ' * indent + '}'
+                write(f'["{key}"]')
+            write(' = ')
+            _write_lua_table(buf, value, indent + 2)
+        write('\n')
+        write(_indent_str(indent))
+        write('}')
     elif isinstance(obj, list):
-        parts = [to_lua_table(item, indent + 2) for item in obj]
-        return '{\n' + ',\n'.join(parts) + '\n' + ' ' * indent + '}'
+        write('{\n')
+        
+        for i, item in enumerate(obj):
+            if i:
+                write(',\n')
+            _write_lua_table(buf, item, indent + 2)
+        write('\n')
+        write(_indent_str(indent))
+        write('}')
     else:
-        return json.dumps(obj, ensure_ascii=False)
+        write(json.dumps(obj, ensure_ascii=False))
+
+
+def to_lua_table(obj, indent=2):
+    """
+    Naively converts a Python object to a Lua table string.
+    """
+    buf = io.StringIO()
+    _write_lua_table(buf, obj, indent)
+    return buf.getvalue()
 
 
 def generate_lua_modules(spec_name, resolved_data, global_config):
@@ -35,24 +71,26 @@ def generate_lua_modules(spec_name, resolved_data, global_config):
     staging_dir = "staging/modules"
     os.makedirs(staging_dir, exist_ok=True)
     spec_base_name = spec_name.replace('_spec', '')
+    # Shared files below are staged by every spec, possibly from several --all-specs
+    # worker processes at once, so they are written atomically.
     # Stage spec-specific or shared utility modules
     if os.path.exists(util_template_dir):
         for f in os.listdir(util_template_dir):
             if f.endswith('.lua'):
-                shutil.copy(os.path.join(util_template_dir, f), os.path.join(staging_dir, f))
+                copy_file_atomic(os.path.join(util_template_dir, f), os.path.join(staging_dir, f))
                 logging.info(f"Staged utility module: {f}")
 
     # Stage spec-specific or shared UI modules
     if os.path.exists(ui_template_dir):
         for f in os.listdir(ui_template_dir):
             if f.endswith('.lua'):
-                shutil.copy(os.path.join(ui_template_dir, f), os.path.join(staging_dir, f))
+                copy_file_atomic(os.path.join(ui_template_dir, f), os.path.join(staging_dir, f))
                 logging.info(f"Staged UI module: {f}")
 
     # Stage general utils.lua from the base template dir
     utils_template_path = os.path.join(template_base_dir, "utils.lua")
     if os.path.exists(utils_template_path):
-        shutil.copy(utils_template_path, os.path.join(staging_dir, "utils.lua"))
+        copy_file_atomic(utils_template_path, os.path.join(staging_dir, "utils.lua"))
         logging.info("Staged general utils module: utils.lua")
 
     # Generate link_common.lua from link_rules.yaml
@@ -66,9 +104,8 @@ def generate_lua_modules(spec_name, resolved_data, global_config):
     upload_config_path = "configs/upload_config.yaml"
     shared_templates = []
     if os.path.exists(upload_config_path):
-        with open(upload_config_path, 'r', encoding='utf-8') as f:
-            u_config = yaml.safe_load(f)
-            shared_templates = u_config.get('shared_templates', [])
+        u_config = load_yaml(upload_config_path)
+        shared_templates = u_config.get('shared_templates', [])
 
     if os.path.exists(wikitemplates_dir):
         spec_keywords = [kw for kw in spec_base_name.lower().split('_') if len(kw) > 3]
@@ -79,7 +116,7 @@ def generate_lua_modules(spec_name, resolved_data, global_config):
                            any(kw in f.lower() for kw in spec_keywords)
                 
                 if is_match:
-                    shutil.copy(os.path.join(wikitemplates_dir, f), os.path.join(staging_wikitemplates_dir, f))
+                    copy_file_atomic(os.path.join(wikitemplates_dir, f), os.path.join(staging_wikitemplates_dir, f))
                     logging.info(f"Staged wikitext template: {f}")
 
 def generate_link_common(template_base_dir, staging_dir):
@@ -92,8 +129,7 @@ def generate_link_common(template_base_dir, staging_dir):
         return
 
     logging.info("Generating link_common.lua from rules...")
-    with open(rules_path, 'r', encoding='utf-8') as f:
-        rules_data = yaml.safe_load(f)
+    rules_data = load_yaml(rules_path)
     
     rules_dict = {r['context']: r for r in rules_data.get('rules', [])}
     lua_rules_table = to_lua_table(rules_dict, indent=0)
@@ -106,6 +142,5 @@ def generate_link_common(template_base_dir, staging_dir):
     
     final_content = template_content.replace("-- [[RULES_PLACEHOLDER]]", lua_rules_table)
     
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(final_content)
+    write_text_atomic(output_path, final_content)
     logging.info("Staged generated module: link_common.lua")
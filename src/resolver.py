@@ -5,73 +5,109 @@ This module takes standardized data sources and a specification config
 to link and combine data into a final, resolved format. It uses a recursive
 approach to build complex, nested output objects.
 """
+import os
 import logging
+import multiprocessing
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from src.utils.logging_config import configure_logging
 
+# Each worker process has to receive a copy of all_data, so parallel resolution only
+# pays off once there are enough items per process to amortize that start-up cost.
+PARALLEL_RESOLVE_MIN_ITEMS_PER_WORKER = 2500
 
-def _get_value(context, rule, all_data, silent=False):
+
+def _compile_linked_getter(rule, silent):
     """
-    Helper to extract a value from the current data context, handling simple, direct, and chained linked lookups.
+    Compiles a chained lookup: resolves 'link_key' against the context, then fetches
+    the linked item (or one of its fields) from the 'from' source.
     """
+    source_name = rule['from']
+    get_lookup_key = _compile_getter(rule['link_key'], silent=True)
+    has_field = 'field' in rule
+    field = rule.get('field')
     
-    if 'link_key' in rule:
-        source_name = rule['from']
+    def get_linked(context, all_data):
         target_source = all_data.get(source_name)
         
         if target_source is None:
             if not silent: logging.warning(f"Source '{source_name}' not found in all_data.")
             return None
-        lookup_key = _get_value(context, rule['link_key'], all_data, silent=True)
+        lookup_key = get_lookup_key(context, all_data)
         
         if lookup_key is None:
             return None
         linked_item = target_source.get(lookup_key)
         
-        if linked_item is None:
-            return None
+        if linked_item is None or not has_field:
+            return linked_item
         
-        if 'field' in rule:
-            if isinstance(linked_item, dict):
-                return linked_item.get(rule['field'])
-            elif isinstance(linked_item, list) and len(linked_item) > 0:
-                # If it's a list (from group_by), we take the field from the first item.
-                return linked_item[0].get(rule['field']) if isinstance(linked_item[0], dict) else None
-            else:
-                if not silent:
-                    logging.warning(f"Rule expects a dictionary to get field '{rule['field']}', but linked item is a {type(linked_item)}.")
-                return None
+        if isinstance(linked_item, dict):
+            return linked_item.get(field)
+        elif isinstance(linked_item, list) and len(linked_item) > 0:
+            # If it's a list (from group_by), we take the field from the first item.
+            return linked_item[0].get(field) if isinstance(linked_item[0], dict) else None
         else:
-            return linked_item
+            if not silent:
+                logging.warning(f"Rule expects a dictionary to get field '{field}', but linked item is a {type(linked_item)}.")
+            return None
+    return get_linked
+
+
+def _compile_getter(rule, silent=False):
+    """
+    Compiles a value rule into an accessor extracting the value from the current data context,
+    handling simple, direct, and chained linked lookups. The rule's shape is decided once here.
+    """
+    
+    if 'link_key' in rule:
+        return _compile_linked_getter(rule, silent)
     elif rule.get('from_context'):
-        return context.get(rule['from_context'])
+        context_key = rule['from_context']
+        return lambda context, all_data: context.get(context_key)
     elif rule.get('from_parent', False):
         if 'field' not in rule:
-            return context
-        return context.get(rule['field'])
-    elif 'from' in rule:
+            return lambda context, all_data: context
+        field = rule['field']
+        return lambda context, all_data: context.get(field)
+    elif 'from' in rule and 'field' in rule:
         source_name = rule['from']
-        source_object = context.get(source_name)
+        field = rule['field']
         
-        if source_object and 'field' in rule:
-            return source_object.get(rule['field'])
+        def get_from_context_source(context, all_data):
+            source_object = context.get(source_name)
+            
+            if source_object:
+                return source_object.get(field)
+            if not silent: logging.warning(f"Could not resolve value for rule: {rule}")
+            return None
+        return get_from_context_source
     
-    if not silent: logging.warning(f"Could not resolve value for rule: {rule}")
-    return None
+    def unresolvable(context, all_data):
+        if not silent: logging.warning(f"Could not resolve value for rule: {rule}")
+        return None
+    return unresolvable
 
 
-def _check_condition(context, condition_rule, all_data):
+def _compile_condition(condition_rule):
     """
-    Checks if a condition is met for a conditional sub-object.
+    Compiles a condition for a conditional sub-object into a check(context, all_data) callable.
     """
-    source_to_check = all_data.get(condition_rule['source'])
-    if source_to_check is None:
-        source_to_check = {}
-        
-    key_to_check = _get_value(context, condition_rule['key'], all_data, silent=True)
+    source_name = condition_rule['source']
+    get_key = _compile_getter(condition_rule['key'], silent=True)
+    should_exist = bool(condition_rule.get('exists'))
     
-    if key_to_check is None:
-        return False
-    exists = key_to_check in source_to_check
-    return exists if condition_rule.get('exists') else not exists
+    def check(context, all_data):
+        source_to_check = all_data.get(source_name)
+        if source_to_check is None:
+            source_to_check = {}
+            
+        key_to_check = get_key(context, all_data)
+        
+        if key_to_check is None:
+            return False
+        return (key_to_check in source_to_check) == should_exist
+    return check
 
 
 def _apply_transform(value, rule, all_data):
@@ -125,7 +161,7 @@ def _apply_transform(value, rule, all_data):
     if transform_type == 'exclude_fields':
         excluded = transform_rule.get('fields', [])
         if not isinstance(value, dict):
-            logging.debug(f"Transform 'exclude_fields' expected a dictionary, but got {type(value)}. Skipping.")
+            logging.debug("Transform 'exclude_fields' expected a dictionary, but got %s. Skipping.", type(value))
             return value
         return {k: v for k, v in value.items() if k not in excluded}
         
@@ -136,122 +172,224 @@ def _apply_transform(value, rule, all_data):
     return value
 
 
-def _resolve_simple_value(context, rule, all_data):
+def _compile_simple_value(rule):
     """
-    Resolves a simple value and applies transforms.
+    Compiles a simple value rule into a resolver that extracts the value and applies transforms.
     """
-    raw_value = _get_value(context, rule, all_data)
-    return _apply_transform(raw_value, rule, all_data)
+    get_value = _compile_getter(rule)
+    
+    if rule.get('transform'):
+        return lambda context, all_data: _apply_transform(get_value(context, all_data), rule, all_data)
+    return get_value
 
 
-def _build_node(context, structure, all_data, level=0):
+def _compile_coalesce(rule):
     """
-    Recursively builds a node in the output tree based on the structure config.
+    Compiles a coalesce rule into a resolver returning the first non-None sub-rule value.
     """
-    output_node = {}
+    sub_resolvers = [(sub_rule.get('from'), _compile_simple_value(sub_rule)) for sub_rule in rule['coalesce']]
     
-    for key, rule in structure.items():
-        if 'condition' in rule:
-            if not _check_condition(context, rule['condition'], all_data):
-                continue
-        logging.debug(f"Processing output field: '{key}' at level {level}")
-        node_type = rule.get('type')
+    def resolve(context, all_data):
+        logging.debug("  - Type: Coalesce")
         
-        if 'coalesce' in rule:
-            logging.debug(f"  - Type: Coalesce")
-            final_value = None
-            
-            for sub_rule in rule['coalesce']:
-                value = _resolve_simple_value(context, sub_rule, all_data)
-                
-                if value is not None:
-                    logging.debug(f"    - [SUCCESS] Found value using source '{sub_rule.get('from')}'.")
-                    final_value = value
-                    break
+        for source_name, resolve_sub_value in sub_resolvers:
+            value = resolve_sub_value(context, all_data)
             
-            if final_value is None:
-                logging.debug(f"    - [FAIL] All coalesce options failed.")
-            output_node[key] = final_value
-        elif node_type == 'object':
-            logging.debug(f"  - Type: Nested Object")
-            
-            if 'fields' not in rule:
-                logging.error(f"Rule for object '{key}' is missing required 'fields' definition.")
-                output_node[key] = None
+            if value is not None:
+                logging.debug("    - [SUCCESS] Found value using source '%s'.", source_name)
+                return value
+        logging.debug("    - [FAIL] All coalesce options failed.")
+        return None
+    return resolve
+
+
+def _compile_object(key, rule, level):
+    """
+    Compiles a nested object rule into a resolver building the child node.
+    """
+    if 'fields' not in rule:
+        logging.error(f"Rule for object '{key}' is missing required 'fields' definition.")
+        return lambda context, all_data: None
+    fields = _compile_structure(rule['fields'], level + 1)
+    
+    def resolve(context, all_data):
+        logging.debug("  - Type: Nested Object")
+        return _build_node(context, fields, all_data, level + 1)
+    return resolve
+
+
+def _compile_list(key, rule, level):
+    """
+    Compiles a list rule into a resolver that collects linked items across its sources,
+    optionally building sub-objects, filtering and grouping them.
+    """
+    sources = rule['from'] if isinstance(rule['from'], list) else [rule['from']]
+    get_lookup_key = _compile_getter(rule['link_key']) if 'link_key' in rule else None
+    field = rule.get('field')
+    has_field = 'field' in rule
+    sub_object = _compile_structure(rule['sub_object'], level + 1) if 'sub_object' in rule else None
+    group_field = rule.get('group_by')
+    filter_field = None
+    
+    if 'filter' in rule:
+        filter_field = rule['filter'].get('field')
+        filter_value = rule['filter'].get('value')
+        
+        if filter_field is None or filter_value is None:
+            logging.warning(f"Filter rule for '{key}' is malformed. Skipping filter.")
+            filter_field = None
+    
+    def resolve(context, all_data):
+        linked_list = []
+        
+        if get_lookup_key is not None:
+            lookup_key = get_lookup_key(context, all_data)
+        
+        for src_name in sources:
+            target_source = all_data.get(src_name, {})
+            if get_lookup_key is not None:
+                items = target_source.get(lookup_key) if lookup_key is not None else None
             else:
-                output_node[key] = _build_node(context, rule['fields'], all_data, level + 1)
-        elif node_type == 'list':
-            sources = rule['from'] if isinstance(rule['from'], list) else [rule['from']]
-            linked_list = []
+                # If no link_key, treat the whole source as the list (or dict to extract from)
+                items = target_source
             
-            for src_name in sources:
-                target_source = all_data.get(src_name, {})
-                if 'link_key' in rule:
-                    lookup_key = _get_value(context, rule['link_key'], all_data)
-                    items = target_source.get(lookup_key) if lookup_key is not None else None
-                else:
-                    # If no link_key, treat the whole source as the list (or dict to extract from)
-                    items = target_source
+            if items:
+                if has_field and isinstance(items, dict):
+                    items = items.get(field, [])
                 
-                if items:
-                    if 'field' in rule and isinstance(items, dict):
-                        items = items.get(rule['field'], [])
-                    
-                    if isinstance(items, list):
-                        linked_list.extend(items)
-                    elif isinstance(items, dict):
-                        # If it's a dict (and no field was specified or found), 
-                        # we might want the values or just the dict itself as one item.
-                        # For unioning sources that are lists-of-dicts, they'll already be lists.
-                        linked_list.append(items)
-            
-            logging.debug(f"  - Found total {len(linked_list)} items across {len(sources)} sources.")
+                if isinstance(items, list):
+                    linked_list.extend(items)
+                elif isinstance(items, dict):
+                    # If it's a dict (and no field was specified or found), 
+                    # we might want the values or just the dict itself as one item.
+                    # For unioning sources that are lists-of-dicts, they'll already be lists.
+                    linked_list.append(items)
+        
+        logging.debug("  - Found total %d items across %d sources.", len(linked_list), len(sources))
+        
+        if sub_object is not None:
+            logging.debug("  - Building list of complex objects...")
+            result = []
             
-            if 'sub_object' in rule:
-                logging.debug(f"  - Building list of complex objects...")
-                list_items = []
-                
-                for i, item in enumerate(linked_list):
-                    if 'filter' in rule:
-                        filter_rule = rule['filter']
-                        field_to_filter = filter_rule.get('field')
-                        value_to_match = filter_rule.get('value')
-                        
-                        if field_to_filter is None or value_to_match is None:
-                            logging.warning(f"Filter rule for '{key}' is malformed. Skipping filter.")
-                        elif item.get(field_to_filter) != value_to_match:
-                            continue
-                    logging.debug(f"  - Building sub-object {i+1}/{len(linked_list)}")
-                    list_items.append(_build_node(item, rule['sub_object'], all_data, level + 1))
-                output_node[key] = list_items
-            else:
-                logging.debug(f"  - Returning bare list as-is.")
-                output_node[key] = linked_list
+            for i, item in enumerate(linked_list):
+                if filter_field is not None and item.get(filter_field) != filter_value:
+                    continue
+                logging.debug("  - Building sub-object %d/%d", i + 1, len(linked_list))
+                result.append(_build_node(item, sub_object, all_data, level + 1))
+        else:
+            logging.debug("  - Returning bare list as-is.")
+            result = linked_list
+        
+        # Application of group_by after list construction
+        if group_field is not None and result:
+            groups = defaultdict(list)
+            for item in result:
+                g_key = item.get(group_field)
+                if g_key is not None: groups[g_key].append(item)
             
-            # Application of group_by after list construction
-            if 'group_by' in rule and output_node[key]:
-                from collections import defaultdict
-                group_field = rule['group_by']
-                groups = defaultdict(list)
-                for item in output_node[key]:
-                    g_key = item.get(group_field)
-                    if g_key is not None: groups[g_key].append(item)
-                
-                # Format as list of { key: ..., items: [...] }
-                output_node[key] = [{"key": k, "items": v} for k, v in sorted(groups.items())]
+            # Format as list of { key: ..., items: [...] }
+            result = [{"key": k, "items": v} for k, v in sorted(groups.items())]
+        return result
+    return resolve
+
+
+def _compile_structure(structure, level=0):
+    """
+    Compiles an output structure config into a list of (key, condition, resolver) entries.
+    Rules are inspected once here rather than re-interpreted for every resolved item.
+    """
+    compiled = []
+    
+    for key, rule in structure.items():
+        condition = _compile_condition(rule['condition']) if 'condition' in rule else None
+        
+        if 'coalesce' in rule:
+            resolver = _compile_coalesce(rule)
+        elif rule.get('type') == 'object':
+            resolver = _compile_object(key, rule, level)
+        elif rule.get('type') == 'list':
+            resolver = _compile_list(key, rule, level)
         else:
-            output_node[key] = _resolve_simple_value(context, rule, all_data)
+            resolver = _compile_simple_value(rule)
+        compiled.append((key, condition, resolver))
+    return compiled
+
+
+def _build_node(context, compiled_structure, all_data, level=0):
+    """
+    Builds a node in the output tree from a compiled structure.
+    """
+    output_node = {}
+    
+    for key, condition, resolver in compiled_structure:
+        if condition is not None and not condition(context, all_data):
+            continue
+        logging.debug("Processing output field: '%s' at level %d", key, level)
+        output_node[key] = resolver(context, all_data)
     return output_node
 
 
+def _resolve_items(spec, output_structure, all_data, items):
+    """
+    Resolves each primary item (or union ID) into an output object.
+    """
+    is_union = spec.get('resolution_strategy') == 'union'
+    log_progress = logging.getLogger().isEnabledFor(logging.DEBUG)
+    total = len(items)
+    resolved_objects = []
+    
+    for i, item in enumerate(items):
+        if log_progress:
+            logging.debug("--- Resolving primary object %d/%d ---", i + 1, total)
+        
+        if is_union:
+            context = {'union_id': item}
+        else:
+            context = {spec['primary_source']: item}
+        resolved_obj = _build_node(context, output_structure, all_data)
+        resolved_objects.append(resolved_obj)
+    return resolved_objects
+
+
+# Per-process state for parallel resolution. Compiled structures hold closures and
+# cannot be pickled, so each worker compiles the spec itself once on startup.
+_worker_state = {}
+
+
+def _init_resolve_worker(spec, all_data, log_level):
+    configure_logging(log_level)
+    _worker_state['spec'] = spec
+    _worker_state['all_data'] = all_data
+    _worker_state['output_structure'] = _compile_structure(spec['output_structure'])
+
+
+def _resolve_chunk(items):
+    return _resolve_items(_worker_state['spec'], _worker_state['output_structure'], _worker_state['all_data'], items)
+
+
+def _resolve_parallel(spec, all_data, items, workers):
+    """
+    Resolves items across a process pool, preserving input order.
+    """
+    # Several chunks per worker keeps the load balanced when item costs vary.
+    chunk_size = -(-len(items) // (workers * 4))
+    chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+    resolved_objects = []
+    
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_resolve_worker,
+                             initargs=(spec, all_data, logging.getLogger().getEffectiveLevel())) as executor:
+        for chunk_result in executor.map(_resolve_chunk, chunks):
+            resolved_objects.extend(chunk_result)
+    return resolved_objects
+
+
 def resolve_data(spec, all_data, items_to_process):
     """ 
     Resolves data based on a specification.
+    Large item sets are resolved in parallel worker processes.
     """
     logging.info("Starting hierarchical data resolution...")
-    resolved_objects = []
-    output_structure = spec['output_structure']
-    is_union = spec.get('resolution_strategy') == 'union'
+    output_structure = _compile_structure(spec['output_structure'])
     is_singleton = spec.get('resolution_strategy') == 'singleton'
     
     if is_singleton:
@@ -260,15 +398,17 @@ def resolve_data(spec, all_data, items_to_process):
         return [resolved_obj]
         
     logging.info(f"Processing {len(items_to_process)} items.")
+    items = list(items_to_process)
+    workers = min(os.cpu_count() or 1, len(items) // PARALLEL_RESOLVE_MIN_ITEMS_PER_WORKER)
+    if multiprocessing.parent_process() is not None:
+        # Already inside a worker (e.g. one spec of a parallel --all-specs run); a nested
+        # pool per worker would multiply both the process count and copies of all_data.
+        workers = 1
     
-    for i, item in enumerate(items_to_process):
-        logging.debug(f"--- Resolving primary object {i+1}/{len(items_to_process)} ---")
-        
-        if is_union:
-            context = {'union_id': item}
-        else:
-            context = {spec['primary_source']: item}
-        resolved_obj = _build_node(context, output_structure, all_data)
-        resolved_objects.append(resolved_obj)
+    if workers > 1:
+        logging.info(f"Resolving in parallel across {workers} processes.")
+        resolved_objects = _resolve_parallel(spec, all_data, items, workers)
+    else:
+        resolved_objects = _resolve_items(spec, output_structure, all_data, items)
     logging.info("Resolution complete.")
     return resolved_objects
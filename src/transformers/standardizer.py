@@ -5,28 +5,28 @@ lookup-friendly format for the resolver.
 It supports multiple strategies, such as creating a unique-key lookup map (dictionary)
 or grouping items by a common key for one-to-many relationships.
 """
-from collections import defaultdict
 
 
 def create_lookup_map(data, key_field):
     """
     Transforms a list of objects into a dict keyed by a unique field.
+    Items whose key field is missing or null are skipped.
     """
-    return {item.get(key_field): item for item in data}
+    return {key: item for item in data if (key := item.get(key_field)) is not None}
 
 
 def create_grouping_map(data, key_field):
     """
     Transforms a list of objects into a dict where each key maps to a list of items.
     """
-    grouped_data = defaultdict(list)
+    grouped_data = {}
     
     for item in data:
         key = item.get(key_field)
         
         if key is not None:
-            grouped_data[key].append(item)
-    return dict(grouped_data)
+            grouped_data.setdefault(key, []).append(item)
+    return grouped_data
 
 
 def standardize_source(source_data, source_spec):
@@ -1,11 +1,58 @@
-import mwclient
-import yaml
 import os
-import json
+import copy
+import functools
+import hashlib
+import mmap
+import orjson
 import logging
 import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
-from src.generators.lua_module_generator import to_lua_table
+from src.utils.config_loader import load_config
+
+# Maximum number of titles the MediaWiki API accepts in one query for regular users.
+PREFETCH_BATCH_SIZE = 50
+# Below this size a single read is cheaper than setting up a memory map.
+MMAP_MIN_BYTES = 16 * 1024 * 1024
+# Threads used to read staged module and template files.
+MODULE_READ_WORKERS = 8
+
+
+def _load_json_file(path):
+    """
+    Parses a JSON file with orjson. Small files are read in one call; large ones are
+    parsed through a read-only memory map instead of being copied into memory first.
+    """
+    with open(path, 'rb') as f:
+        # Also covers empty files, which cannot be mapped; orjson reports them as invalid JSON.
+        if os.fstat(f.fileno()).st_size < MMAP_MIN_BYTES:
+            return orjson.loads(f.read())
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped, memoryview(mapped) as view:
+            return orjson.loads(view)
+
+
+def _read_staged_file(local_path):
+    """
+    Reads a staged module or template. Returns None (after logging why) if it cannot be read.
+    """
+    try:
+        with open(local_path, 'r', encoding='utf-8') as f:
+            return f.read()
+    except FileNotFoundError:
+        logging.warning(f"Local file not found, skipping: {local_path}")
+    except Exception as e:
+        logging.error(f"Error while processing {local_path}: {e}")
+    return None
+
+
+@functools.lru_cache(maxsize=1)
+def _load_meta_template():
+    """
+    Parses the meta.json template once per process. Callers must copy it before modifying.
+    """
+    with open('src/generators/templates/meta.json', 'rb') as f:
+        return orjson.loads(f.read())
 
 
 class WikiUploader:
@@ -15,8 +62,7 @@ class WikiUploader:
     def __init__(self, config_path='configs/upload_config.yaml'):
         load_dotenv()
         try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                self.upload_config = yaml.safe_load(f)
+            self.upload_config = load_config(config_path)
         except FileNotFoundError:
             logging.error(f"{config_path} not found.")
             self.upload_config = {}
@@ -26,6 +72,14 @@ class WikiUploader:
         wiki_config = self.upload_config.get('wiki', {})
         self.upload_delay = wiki_config.get('upload_delay', 0)
         self.query_delay = wiki_config.get('query_delay', min(1.0, self.upload_delay / 2) if self.upload_delay > 0 else 0)
+        self.upload_workers = max(1, wiki_config.get('upload_workers', 4))
+        # Saves from all upload workers share one schedule so upload_delay caps the wiki-wide save rate
+        self._save_lock = threading.Lock()
+        self._next_save_at = 0.0
+        # Known current page text and revision SHA-1 (fetched in bulk by _prefetch_pages);
+        # a None SHA-1 marks a missing page.
+        self._current_pages = {}
+        self._current_sha1 = {}
         host = wiki_config.get('host')
         path = wiki_config.get('path', '/w/')
         username = os.getenv("WIKI_USERNAME")
@@ -36,8 +90,20 @@ class WikiUploader:
             logging.info("Skipping wiki connection.")
             self.site = None
             return
+        # mwclient (and requests behind it) is only needed once there is a wiki to talk to
+        import mwclient
+        import requests
+        from requests.adapters import HTTPAdapter
+        # mwclient talks through one requests.Session; hand it one whose keep-alive pool
+        # holds a connection per upload worker, so none of them has to reconnect. mwclient
+        # only sets its User-Agent on sessions it creates itself.
+        session = requests.Session()
+        session.headers['User-Agent'] = mwclient.client.USER_AGENT
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.upload_workers)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
         logging.info(f"Connecting to wiki at {host}...")
-        self.site = mwclient.Site(host, path=path)
+        self.site = mwclient.Site(host, path=path, pool=session)
         try:
             self.site.login(username, password)
             logging.info("Login successful.")
@@ -45,6 +111,13 @@ class WikiUploader:
             logging.error(f"Login failed: {e}")
             self.site = None
     
+    @staticmethod
+    def _full_page_name(page_name, prefix, is_history=False):
+        """
+        History pages are already fully qualified; everything else is relative to its prefix.
+        """
+        return page_name if is_history else prefix + page_name
+    
     def _upload_content(self, page_name, prefix, content, summary, is_history=False):
         """
         Helper function to upload content to a single wiki page, skipping if identical to current content.
@@ -55,20 +128,46 @@ class WikiUploader:
             logging.warning(f"SKIPPING upload to '{page_name}' (no wiki connection)")
             return
         
-        full_page_name = page_name if is_history else prefix + page_name
+        full_page_name = self._full_page_name(page_name, prefix, is_history)
+        # MediaWiki strips trailing whitespace on save, so hash the content the way it will be stored
+        content_sha1 = hashlib.sha1(content.rstrip().encode('utf-8')).hexdigest()
         
         # Check if upload is necessary by comparing with current page content
         is_already_up_to_date = False
         max_query_retries = 3
         for attempt in range(max_query_retries):
             try:
-                if self.query_delay > 0:
-                    time.sleep(self.query_delay)
-                
-                page = self.site.pages[full_page_name]
-                if page.exists:
-                    current_text = page.text()
+                if full_page_name in self._current_sha1:
+                    current_sha1 = self._current_sha1[full_page_name]
+                    current_text = self._current_pages.get(full_page_name)
+                    if current_text is None and current_sha1 is not None and current_sha1 != content_sha1:
+                        # Prefetched hashes only; download the text of pages that changed
+                        if self.query_delay > 0:
+                            time.sleep(self.query_delay)
+                        page = self.site.pages[full_page_name]
+                        current_text = page.text()
+                elif full_page_name in self._current_pages:
+                    current_text = self._current_pages[full_page_name]
+                    current_sha1 = None
+                else:
+                    if self.query_delay > 0:
+                        time.sleep(self.query_delay)
                     
+                    page = self.site.pages[full_page_name]
+                    current_text = current_sha1 = None
+                    if page.exists:
+                        # Only download the text when the cheap hash check is inconclusive
+                        latest_revision = next(iter(page.revisions(prop='sha1', max_items=1, api_chunk_size=1)), {})
+                        current_sha1 = latest_revision.get('sha1')
+                        if current_sha1 != content_sha1:
+                            current_text = page.text()
+                
+                if current_sha1 == content_sha1:
+                    logging.info(f"Page '{full_page_name}' is up to date. Skipping upload.")
+                    is_already_up_to_date = True
+                    break
+                
+                if current_text is not None:
                     # Robust comparison: ignore leading/trailing whitespace
                     if current_text and current_text.strip() == content.strip():
                         logging.info(f"Page '{full_page_name}' is up to date. Skipping upload.")
@@ -78,11 +177,11 @@ class WikiUploader:
                     # Special handling for JSON comparison
                     if full_page_name.endswith('.json'):
                         try:
-                            if json.loads(current_text) == json.loads(content):
+                            if orjson.loads(current_text) == orjson.loads(content):
                                 logging.info(f"JSON data for '{full_page_name}' is identical. Skipping upload.")
                                 is_already_up_to_date = True
                                 break
-                        except (json.JSONDecodeError, ValueError):
+                        except orjson.JSONDecodeError:
                             pass
                 break # Page doesn't exist or is not up to date
             except Exception as e:
@@ -102,34 +201,110 @@ class WikiUploader:
         max_upload_retries = 3
         for attempt in range(max_upload_retries):
             try:
-                if self.upload_delay > 0:
-                    logging.debug(f"Rate limiting: Waiting {self.upload_delay}s before save...")
-                    time.sleep(self.upload_delay)
-                    
+                self._wait_for_save_slot()
                 logging.info(f"Uploading to '{full_page_name}'...")
                 # Re-fetch page object if needed
                 page = self.site.pages[full_page_name] if 'page' not in locals() else page
                 page.save(content, summary=summary)
+                self._current_pages[full_page_name] = content
+                self._current_sha1[full_page_name] = content_sha1
                 logging.info(f"Successfully uploaded to {full_page_name}")
                 break
             except Exception as e:
                 if "429" in str(e) and attempt < max_upload_retries - 1:
                     wait_time = (attempt + 1) * 10 # Longer wait for save failures
                     logging.warning(f"429 Too Many Requests while uploading {full_page_name}. Retrying in {wait_time}s...")
-                    time.sleep(wait_time)
+                    # Back off all workers, not just this one
+                    self._defer_saves(wait_time)
                 else:
                     logging.error(f"Failed to upload to {full_page_name}: {e}")
                     break
     
-    def _upload_modules(self, version, spec_name=None, target='all'):
-        logging.info("--- Uploading Lua modules and/or Templates... ---")
+    def _wait_for_save_slot(self):
+        """
+        Blocks until the next save slot. Slots are handed out at least upload_delay seconds
+        apart across all upload workers; page queries are not throttled here.
+        """
+        with self._save_lock:
+            now = time.monotonic()
+            slot = max(now, self._next_save_at)
+            self._next_save_at = slot + self.upload_delay
+        if slot > now:
+            logging.debug(f"Rate limiting: Waiting {slot - now:.1f}s before save...")
+            time.sleep(slot - now)
+    
+    def _defer_saves(self, seconds):
+        """
+        Pushes the shared save schedule back, e.g. after the wiki answered 429.
+        """
+        with self._save_lock:
+            self._next_save_at = max(self._next_save_at, time.monotonic() + seconds)
+    
+    def _prefetch_pages(self, titles):
+        """
+        Fetches the current revision SHA-1 of many pages with batched revision queries
+        (up to 50 titles per request) so _upload_content can skip its per-page lookup and
+        only download the text of pages that changed. Pages left out of a response are
+        simply looked up individually later.
+        """
+        titles = [t for t in dict.fromkeys(titles)
+                  if t not in self._current_pages and t not in self._current_sha1]
+        for i in range(0, len(titles), PREFETCH_BATCH_SIZE):
+            batch = titles[i:i + PREFETCH_BATCH_SIZE]
+            params = {
+                'prop': 'revisions', 'rvprop': 'sha1',
+                'titles': '|'.join(batch), 'formatversion': 2
+            }
+            continue_params = {}
+            try:
+                while True:
+                    if self.query_delay > 0:
+                        time.sleep(self.query_delay)
+                    result = self.site.api('query', **params, **continue_params)
+                    query = result.get('query', {})
+                    # Map normalized titles back to the names we asked for
+                    requested = {n['to']: n['from'] for n in query.get('normalized', [])}
+                    for page in query.get('pages', []):
+                        title = requested.get(page['title'], page['title'])
+                        if 'missing' in page:
+                            self._current_sha1[title] = None
+                        elif page.get('revisions'):
+                            # A hidden SHA-1 compares unequal, so the text is fetched instead
+                            self._current_sha1[title] = page['revisions'][0].get('sha1', '')
+                    if 'continue' not in result:
+                        break
+                    continue_params = result['continue']
+            except Exception as e:
+                logging.debug(f"Failed to prefetch page hashes for {len(batch)} pages: {e}")
+    
+    def _run_uploads(self, uploads):
+        """
+        Uploads a batch of pages concurrently. Each entry holds the positional
+        arguments for _upload_content; failures are logged per page.
+        """
+        if not uploads:
+            return
+        if self.site:
+            self._prefetch_pages(self._full_page_name(args[0], args[1], *args[4:]) for args in uploads)
+        with ThreadPoolExecutor(max_workers=min(self.upload_workers, len(uploads))) as executor:
+            futures = {executor.submit(self._upload_content, *args): args[0] for args in uploads}
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    logging.error(f"Failed to upload to {futures[future]}: {e}")
+
+    def _filter_module_groups(self, base_spec_name, is_map_spec, target):
+        """
+        Selects the module groups (and the modules within them) that an upload run covers.
+        Returns a list of (prefix, staging_dir, upload_map) tuples.
+        """
         module_groups = self.upload_config.get('module_groups', [])
         
         if not module_groups:
             logging.warning("No module_groups found in upload_config.yaml")
-            return
-        staging_dir = "staging/modules"
-        summary = f"Automated module update for version {version}"
+            return []
+        filtered_groups = []
         
         for group in module_groups:
             prefix = group.get('prefix', '')
@@ -141,13 +316,9 @@ class WikiUploader:
                 continue
                 
             module_map = group.get('modules', {})
-            current_staging_dir = group.get('staging_dir', staging_dir)
             upload_map = module_map
             
-            if spec_name:
-                logging.info(f"Filtering module upload for spec: {spec_name}")
-                base_spec_name = spec_name.replace('_spec', '')
-                is_map_spec = spec_name == 'map_location_spec'
+            if base_spec_name is not None:
                 is_map_group = prefix == 'Map'
                 
                 if is_map_group and not is_map_spec:
@@ -161,18 +332,46 @@ class WikiUploader:
                         (k.endswith('.wikitext') and (base_spec_name in k.lower() or k == 'Infobox.wikitext'))
                     }
                     if upload_map:
-                        logging.info(f"Filtered {len(upload_map)} modules for upload (spec: {spec_name}): {list(upload_map.keys())}")
+                        logging.info(f"Filtered {len(upload_map)} modules for upload (group: {prefix}): {list(upload_map.keys())}")
             
-            for local_file, wiki_page_name in upload_map.items():
-                local_path = os.path.join(current_staging_dir, local_file)
-                try:
-                    with open(local_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                    self._upload_content(wiki_page_name, prefix, content, summary)
-                except FileNotFoundError:
-                    logging.warning(f"Local file not found, skipping: {local_path}")
-                except Exception as e:
-                    logging.error(f"Error while processing {local_path}: {e}")
+            filtered_groups.append((prefix, group.get('staging_dir', "staging/modules"), upload_map))
+        return filtered_groups
+    
+    def _filter_data_map(self, base_spec_name):
+        """
+        Selects the data files an upload run covers.
+        """
+        data_map = self.upload_config.get('data', {})
+        
+        if not data_map:
+            logging.warning("No data mappings found in upload_config.yaml")
+            return {}
+        if base_spec_name is None:
+            return data_map
+        return {k: v for k, v in data_map.items() if k.startswith(base_spec_name)}
+    
+    def _upload_modules(self, version, module_groups):
+        logging.info("--- Uploading Lua modules and/or Templates... ---")
+        summary = f"Automated module update for version {version}"
+        pending = [
+            (wiki_page_name, prefix, os.path.join(current_staging_dir, local_file))
+            for prefix, current_staging_dir, upload_map in module_groups
+            for local_file, wiki_page_name in upload_map.items()
+        ]
+        if not pending:
+            return
+        
+        # Read stage: overlap the file reads, keeping the configured order
+        with ThreadPoolExecutor(max_workers=min(MODULE_READ_WORKERS, len(pending))) as executor:
+            contents = list(executor.map(_read_staged_file, [local_path for _, _, local_path in pending]))
+        
+        # Upload stage
+        uploads = [
+            (wiki_page_name, prefix, content, summary)
+            for (wiki_page_name, prefix, _), content in zip(pending, contents)
+            if content is not None
+        ]
+        self._run_uploads(uploads)
     
     def _upload_meta(self, version, is_historical=False):
         if is_historical:
@@ -185,35 +384,25 @@ class WikiUploader:
         logging.info(f"Updating metadata file: {meta_prefix}{meta_page_name}")
         meta_data = {"versions": [], "codex_added_fields": []}
         try:
-            with open('src/generators/templates/meta.json', 'r', encoding='utf-8') as f:
-                meta_data = json.load(f)
+            meta_data = copy.deepcopy(_load_meta_template())
         except FileNotFoundError:
             logging.warning("meta.json not found, creating a new one.")
         
         if version_id not in meta_data['versions']:
             meta_data['versions'].insert(0, version_id)
-        self._upload_content(meta_page_name, meta_prefix, json.dumps(meta_data, separators=(',', ':')), f"Add data version {version_id}")
+        self._upload_content(meta_page_name, meta_prefix, orjson.dumps(meta_data).decode('utf-8'), f"Add data version {version_id}")
     
-    def _upload_data(self, version, spec_name=None, is_historical=False):
+    def _upload_data(self, version, upload_map, is_historical=False):
         import datetime
+        from src.generators.lua_module_generator import to_lua_table
         logging.info("--- Uploading data files... ---")
-        data_map = self.upload_config.get('data', {})
         data_prefix = "Module:Data"
         
-        if not data_map:
-            logging.warning("No data mappings found in upload_config.yaml")
+        if not upload_map:
             return
-        upload_map = data_map
-        
-        if spec_name:
-            logging.info(f"Filtering data upload for spec: {spec_name}")
-            base_spec_name = spec_name.replace('_spec', '')
-            upload_map = {
-                k: v for k, v in data_map.items()
-                if k.startswith(base_spec_name)
-            }
         version_id = version
         logging.info(f"Using version ID for this run: {version_id}")
+        uploads = []
         
         for local_file, config in upload_map.items():
             wiki_page_name = config['page'] if isinstance(config, dict) else config
@@ -222,23 +411,22 @@ class WikiUploader:
             local_path = os.path.join("staging/outputs", local_file)
             logging.info(f"Processing data file: {local_path}")
             try:
-                with open(local_path, 'r', encoding='utf-8') as f:
-                    resolved_data = json.load(f)
+                resolved_data = _load_json_file(local_path)
                 summary = f"Automated data update for version {version_id}"
                 content_to_upload = ''
                 
                 if wiki_page_name.endswith('.json'):
                     if isinstance(resolved_data, list):
-                        content_to_upload = json.dumps({'data': resolved_data}, separators=(',', ':'))
+                        content_to_upload = orjson.dumps({'data': resolved_data}).decode('utf-8')
                     else:
-                        content_to_upload = json.dumps(resolved_data, separators=(',', ':'))
+                        content_to_upload = orjson.dumps(resolved_data).decode('utf-8')
                 else:
                     id_field = 'id'
-                    data_for_lua = {item.get(id_field): item for item in resolved_data if item.get(id_field) is not None}
+                    data_for_lua = {item_id: item for item in resolved_data if (item_id := item.get(id_field)) is not None}
                     content_to_upload = "return " + to_lua_table(data_for_lua)
                 
                 if not is_historical:
-                    self._upload_content(wiki_page_name, data_prefix, content_to_upload, summary)
+                    uploads.append((wiki_page_name, data_prefix, content_to_upload, summary))
                 
                 # History Handling
                 if history_type == 'timestamped':
@@ -270,9 +458,9 @@ class WikiUploader:
                                     latest_content = content_to_upload # Equal strings
                                 elif wiki_page_name.endswith('.json'):
                                     try:
-                                        if json.loads(latest_content) == json.loads(content_to_compare):
+                                        if orjson.loads(latest_content) == orjson.loads(content_to_compare):
                                             latest_content = content_to_upload # Equal objects
-                                    except (json.JSONDecodeError, ValueError):
+                                    except orjson.JSONDecodeError:
                                         pass
                     
                     if latest_content == content_to_upload:
@@ -280,16 +468,18 @@ class WikiUploader:
                     else:
                         timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M")
                         history_page_name = f"{history_folder_full}/{timestamp}.json"
-                        self._upload_content(history_page_name, "", content_to_upload, summary, is_history=True)
+                        uploads.append((history_page_name, "", content_to_upload, summary, True))
                 else:
                     # Legacy single history file
                     history_page_name = f"{data_prefix}{self.history_prefix}/{version_id}{wiki_page_name}"
-                    self._upload_content(history_page_name, data_prefix, content_to_upload, summary, is_history=True)
+                    uploads.append((history_page_name, data_prefix, content_to_upload, summary, True))
                     
             except FileNotFoundError:
                 logging.error(f"Local file not found: {local_path}")
             except Exception as e:
                 logging.error(f"Error while processing {local_path}: {e}")
+        
+        self._run_uploads(uploads)
     
     def _upload_maps(self, version, spec_name=None):
         logging.info("--- Uploading JSON maps... ---")
@@ -352,8 +542,11 @@ class WikiUploader:
             
             try:
                 page = self.site.pages[full_meta_name]
-                if page.exists:
-                    meta_content = json.loads(page.text())
+                # Remember the online meta so _upload_meta can skip an unchanged page without another lookup
+                meta_text = page.text() if page.exists else None
+                self._current_pages[full_meta_name] = meta_text
+                if meta_text is not None:
+                    meta_content = orjson.loads(meta_text)
                     online_versions = meta_content.get('versions', [])
                     if online_versions:
                         latest_online = online_versions[0]
@@ -372,14 +565,27 @@ class WikiUploader:
                 logging.debug(f"Failed to fetch online metadata for safety check: {e}")
                 # Continue if we can't check (e.g., first time setup)
 
+        # Resolve which modules and data files this run covers once, up front
+        base_spec_name = None
+        if spec_name:
+            logging.info(f"Filtering uploads for spec: {spec_name}")
+            base_spec_name = spec_name.replace('_spec', '')
+        is_map_spec = spec_name == 'map_location_spec'
+        module_groups = []
+        data_map = {}
+        if upload_target in ['modules', 'templates', 'all']:
+            module_groups = self._filter_module_groups(base_spec_name, is_map_spec, upload_target)
+        if upload_target in ['data', 'all']:
+            data_map = self._filter_data_map(base_spec_name)
+
         if upload_target in ['modules', 'data', 'maps', 'templates', 'all']:
             self._upload_meta(version, is_historical=is_historical)
         
         if upload_target in ['modules', 'templates', 'all']:
-            self._upload_modules(version, spec_name=spec_name, target=upload_target)
+            self._upload_modules(version, module_groups)
         
         if upload_target in ['data', 'all']:
-            self._upload_data(version, spec_name=spec_name, is_historical=is_historical)
+            self._upload_data(version, data_map, is_historical=is_historical)
         
         if upload_target in ['maps', 'all']:
             self._upload_maps(version, spec_name=spec_name)
@@ -1,10 +1,87 @@
+import copy
+import functools
+import logging
+import os
+import orjson
 import yaml
 
+# Use the libyaml-backed loader when PyYAML was built with it.
+Loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+
+def _read_json_sidecar(sidecar_path, mtime):
+    """
+    Returns the data stored in a YAML file's JSON sidecar, or None if it is missing,
+    older than the YAML file, or unreadable.
+    """
+    try:
+        if os.path.getmtime(sidecar_path) < mtime:
+            return None
+        with open(sidecar_path, 'rb') as f:
+            return orjson.loads(f.read())
+    except (OSError, orjson.JSONDecodeError):
+        return None
+
+
+def _write_json_sidecar(sidecar_path, data):
+    """
+    Atomically stores parsed YAML as JSON. Skipped when the data does not survive a
+    JSON round trip unchanged (e.g. non-string keys or dates).
+    """
+    try:
+        encoded = orjson.dumps(data)
+        if orjson.loads(encoded) != data:
+            return
+    except (TypeError, orjson.JSONEncodeError):
+        return
+
+    tmp_path = f"{sidecar_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(encoded)
+        os.replace(tmp_path, sidecar_path)
+    except OSError as e:
+        logging.debug(f"Could not write YAML cache {sidecar_path}: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+@functools.lru_cache(maxsize=None)
+def _parse_yaml(path, mtime):
+    """
+    Parses a YAML file. Cached per (path, mtime) so edits on disk invalidate the entry,
+    and persisted as a <path>.json sidecar so later runs can skip the YAML parse.
+    """
+    sidecar_path = f"{path}.json"
+    data = _read_json_sidecar(sidecar_path, mtime)
+    if data is not None:
+        return data
+
+    with open(path, 'r', encoding='utf-8') as f:
+        data = yaml.load(f, Loader=Loader)
+    _write_json_sidecar(sidecar_path, data)
+    return data
+
+
+def load_yaml(path):
+    """
+    Loads a YAML file, reusing the parsed result while the file is unchanged.
+    The returned object is shared between callers and must not be mutated.
+    """
+    return _parse_yaml(path, os.path.getmtime(path))
+
+
+def load_config(path):
+    """
+    Loads a YAML config file and returns a private copy that callers may modify.
+    """
+    return copy.deepcopy(load_yaml(path))
+
 
 def load_spec(spec_name):
     """
     Loads a specification file from the configs directory.
+    Memoized through load_yaml; the returned spec is shared and must be treated as read-only.
     """
     path = f"configs/specs/{spec_name}.yaml"
-    with open(path, 'r', encoding='utf-8') as f:
-        return yaml.safe_load(f)
+    return load_yaml(path)
@@ -1,6 +1,7 @@
-import json
-from Crypto.Cipher import AES
-from Crypto.Util.Padding import unpad
+import orjson
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
+AES_BLOCK_BYTES = algorithms.AES.block_size // 8
 
 
 def decode_survival_dat(file_bytes):
@@ -10,11 +11,22 @@ def decode_survival_dat(file_bytes):
     """
     try:
         key = b"holoearthmasters"
-        iv = file_bytes[:16]
-        encrypted_content = file_bytes[16:]
-        cipher = AES.new(key, AES.MODE_CBC, iv=iv)
-        decrypted_data = unpad(cipher.decrypt(encrypted_content), AES.block_size)
-        return json.loads(decrypted_data)
+        # Work on views of the input and decrypt into one preallocated buffer,
+        # so the ciphertext and plaintext are never copied.
+        view = memoryview(file_bytes)
+        iv = bytes(view[:16])
+        encrypted_content = view[16:]
+        decryptor = Cipher(algorithms.AES(key), modes.CBC(iv)).decryptor()
+        decrypted_data = bytearray(len(encrypted_content) + AES_BLOCK_BYTES - 1)
+        size = decryptor.update_into(encrypted_content, decrypted_data)
+        decryptor.finalize()
+
+        # Strip the PKCS#7 padding in place
+        pad = decrypted_data[size - 1] if size else 0
+        if not 1 <= pad <= AES_BLOCK_BYTES or decrypted_data[size - pad:size] != bytes((pad,)) * pad:
+            raise ValueError("Invalid padding bytes.")
+        del decrypted_data[size - pad:]
+        return orjson.loads(decrypted_data)
     except Exception as e:
         print(f"ERROR: Failed to decrypt and parse data. Reason: {e}")
         return None
@@ -24,7 +36,7 @@ def decode_json(file_bytes):
     Decodes a standard UTF-8 JSON file.
     """
     try:
-        return json.loads(file_bytes.decode('utf-8'))
+        return orjson.loads(file_bytes)
     except Exception as e:
         print(f"ERROR: Failed to parse JSON data. Reason: {e}")
         return None
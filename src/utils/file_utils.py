@@ -0,0 +1,52 @@
+import os
+import shutil
+import tempfile
+
+# tempfile.mkstemp creates owner-only (0600) files; written files get the mode a plain
+# open() would have given them instead. Read once, as reading the umask also sets it.
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def _write_atomic(path, data, mode, encoding=None, mode_from=None):
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, mode, encoding=encoding) as f:
+            f.write(data)
+        if mode_from:
+            shutil.copymode(mode_from, tmp_path)
+        else:
+            os.chmod(tmp_path, 0o666 & ~_UMASK)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def write_bytes_atomic(path, data):
+    """
+    Writes a file through a temporary file in the same directory and os.replace, so
+    concurrent writers (threads or processes) never leave a partially written file.
+    """
+    _write_atomic(path, data, 'wb')
+
+
+def write_text_atomic(path, text):
+    """
+    Text-mode (UTF-8, platform newlines) counterpart of write_bytes_atomic.
+    """
+    _write_atomic(path, text, 'w', encoding='utf-8')
+
+
+def copy_file_atomic(src_path, dst_path):
+    """
+    Copies a (small) file like shutil.copy (contents and permission bits), but atomically
+    as in write_bytes_atomic.
+    """
+    with open(src_path, 'rb') as f:
+        _write_atomic(dst_path, f.read(), 'wb', mode_from=src_path)
@@ -0,0 +1,9 @@
+import logging
+
+
+def configure_logging(log_level):
+    """
+    Configures root logging. Also used as a process pool initializer, since spawned
+    worker processes do not inherit the parent's logging setup.
+    """
+    logging.basicConfig(level=log_level, format='%(asctime)s - %(levelname)s - %(message)s')
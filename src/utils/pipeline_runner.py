@@ -1,11 +1,25 @@
 import os
+import functools
 import importlib
 import logging
 import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from src.utils.config_loader import load_spec
 from src.transformers.standardizer import standardize_source
 from src.resolver import resolve_data
 
+
+def _iter_rows(source_data):
+    """
+    Yields every row of a standardized source, flattening group_by lists.
+    """
+    for item_or_list in source_data.values():
+        if isinstance(item_or_list, list):
+            yield from item_or_list
+        else:
+            yield item_or_list
+
+
 class PipelineRunner:
     """
     Encapsulates the data extraction and resolution stages for reuse.
@@ -13,7 +27,12 @@ class PipelineRunner:
     def __init__(self, global_config):
         self.global_config = global_config
 
-    def get_extractor(self, type_name):
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def get_extractor(type_name):
+        """
+        Resolves the extractor class for a source type. Cached per type name.
+        """
         if type_name == 'local_file':
             module_name = 'src.extractors.local_file_extractor'
             class_name = 'LocalFileExtractor'
@@ -31,6 +50,14 @@ class PipelineRunner:
             logging.error(f"Could not load extractor {class_name} from {module_name}: {e}")
             raise
 
+    def _extract_one(self, source_spec):
+        """
+        Runs the extractor matching a single source spec and returns its raw data.
+        """
+        ExtractorClass = self.get_extractor(source_spec['type'])
+        extractor = ExtractorClass()
+        return extractor.extract(source_spec, self.global_config)
+
     def run_spec(self, spec_name, skip_resolution=False):
         """
         Runs Stage 1 and Stage 2 for a single specification.
@@ -44,24 +71,38 @@ class PipelineRunner:
             return None, None
 
         # --- Stage 1: Extraction & Standardization ---
+        # Extractors are I/O-bound (HTTP fetches, file reads), so non-manual sources
+        # are extracted concurrently. Results are still standardized in spec order.
+        sources = spec.get('sources', [])
+        extracted = {}
+        futures = {}
+        extract_indices = [i for i, s in enumerate(sources) if s['type'] != 'manual']
+
+        if extract_indices:
+            with ThreadPoolExecutor(max_workers=min(16, len(extract_indices))) as executor:
+                for i in extract_indices:
+                    futures[executor.submit(self._extract_one, sources[i])] = i
+
+                for future in as_completed(futures):
+                    i = futures[future]
+                    try:
+                        extracted[i] = future.result()
+                    except Exception as e:
+                        logging.error(f"Failed to run extractor for type '{sources[i]['type']}'. {e}")
+
         all_data = {}
-        for source_spec in spec.get('sources', []):
+        for i, source_spec in enumerate(sources):
             source_name = source_spec['name']
-            source_type = source_spec['type']
-            
-            if source_type == 'manual':
+
+            if source_spec['type'] == 'manual':
                 raw_data = source_spec['data']
+            elif i in extracted:
+                raw_data = extracted[i]
             else:
-                try:
-                    ExtractorClass = self.get_extractor(source_type)
-                    extractor = ExtractorClass()
-                    raw_data = extractor.extract(source_spec, self.global_config)
-                except Exception as e:
-                    logging.error(f"Failed to run extractor for type '{source_type}'. {e}")
-                    continue
+                continue
 
             all_data[source_name] = standardize_source(raw_data, source_spec)
-        
+
         if skip_resolution:
             return all_data, None
 
@@ -76,14 +117,9 @@ class PipelineRunner:
                 source_data = all_data.get(source_name)
                 if not source_data: continue
                 
-                for item_or_list in source_data.values():
-                    if isinstance(item_or_list, list):
-                        for sub_item in item_or_list:
-                            item_id = sub_item.get(id_field)
-                            if item_id is not None: master_id_set.add(item_id)
-                    else:
-                        item_id = item_or_list.get(id_field)
-                        if item_id is not None: master_id_set.add(item_id)
+                master_id_set.update(item.get(id_field) for item in _iter_rows(source_data))
+            # Rows without an ID contribute None, which is not a valid union member.
+            master_id_set.discard(None)
             resolved_objects = resolve_data(spec, all_data, master_id_set)
         else:
             primary_source_name = spec.get('primary_source')
@@ -92,12 +128,7 @@ class PipelineRunner:
                 logging.warning(f"Primary source '{primary_source_name}' is missing or empty for '{spec_name}'. Skipping resolution.")
                 return all_data, []
                 
-            items_to_process = []
-            for item_or_list in primary_data.values():
-                if isinstance(item_or_list, list):
-                    items_to_process.extend(item_or_list)
-                else:
-                    items_to_process.append(item_or_list)
+            items_to_process = list(_iter_rows(primary_data))
             resolved_objects = resolve_data(spec, all_data, items_to_process)
             
         return all_data, resolved_objects